@@ -1,4 +1,5 @@
 import os
+import re
 import json
 from groq import Groq
 from dotenv import load_dotenv
@@ -9,6 +10,7 @@ from query_engine import (
     get_transaction_trends
 )
 from data_loader import get_summary
+from segment_index import get_top_segments, get_anomalies
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"))
 
@@ -51,6 +53,30 @@ def classify_intent(question: str) -> str:
         return "general"
 
 
+DIMENSION_KEYWORDS = {
+    "network": "network_type",
+    "device": "device_type",
+    "bank": "sender_bank",
+    "state": "sender_state",
+    "merchant": "merchant_category",
+    "category": "merchant_category",
+    "age": "sender_age_group",
+    "hour": "hour_of_day",
+    "day": "day_of_week",
+    "p2p": "transaction_type",
+    "p2m": "transaction_type",
+}
+
+
+def detect_dimensions(question: str) -> list:
+    question_lower = question.lower()
+    dimensions = []
+    for word, dimension in DIMENSION_KEYWORDS.items():
+        if re.search(rf"\b{word}s?\b", question_lower) and dimension not in dimensions:
+            dimensions.append(dimension)
+    return dimensions[:2]
+
+
 def fetch_relevant_data(intent: str, question: str) -> dict:
     data = {"summary": get_summary()}
     
@@ -74,6 +100,19 @@ def fetch_relevant_data(intent: str, question: str) -> dict:
         data["failure_analysis"] = get_failure_analysis()
         data["trends"] = get_transaction_trends()
         data["regional_analysis"] = get_regional_analysis()
+
+    question_lower = question.lower()
+    metric = "fraud_rate" if "fraud" in question_lower else "failure_rate"
+    dimensions = detect_dimensions(question)
+    if dimensions:
+        # highest failure / fraud rate is the worst end of the ranking
+        data["worst_segments"] = get_top_segments(dimensions, metric=metric, k=5)
+    if (
+        intent in ("failure", "regional", "segment")
+        or dimensions
+        or any(word in question_lower for word in ["fraud", "anomal"])
+    ):
+        data["segment_anomalies"] = get_anomalies(metric=metric, k=5)
     
     return data
 
@@ -5,6 +5,7 @@ from typing import Dict, List, Any
 DATA_PATH = os.path.join(os.path.dirname(__file__), "../data/upi_transactions_2024.csv")
 
 _records: List[Dict[str, Any]] | None = None
+_version = 0
 
 
 def _normalize_column(name: str) -> str:
@@ -17,15 +18,7 @@ def _normalize_column(name: str) -> str:
     )
 
 
-def get_records() -> List[Dict[str, Any]]:
-    """
-    Lightweight in‑memory representation of the CSV data using
-    built‑in types only (no pandas / numpy).
-    """
-    global _records
-    if _records is not None:
-        return _records
-
+def _load_records() -> List[Dict[str, Any]]:
     print("Loading dataset...")
     records: List[Dict[str, Any]] = []
 
@@ -40,13 +33,48 @@ def get_records() -> List[Dict[str, Any]]:
                 normalized[key] = value
             records.append(normalized)
 
+    print(f"Dataset loaded: {len(records)} rows")
+    if records:
+        print(f"Columns: {sorted(records[0].keys())}")
+    return records
+
+
+def get_records() -> List[Dict[str, Any]]:
+    """
+    Lightweight in‑memory representation of the CSV data using
+    built‑in types only (no pandas / numpy).
+    """
+    global _records
+    if _records is not None:
+        return _records
+
+    _records = _load_records()
+    return _records
+
+
+def reload_records() -> List[Dict[str, Any]]:
+    """
+    Re-read the CSV and swap it in atomically, bumping the data version
+    so downstream caches and live subscribers know to recompute.
+    """
+    global _records, _version
+    records = _load_records()
     _records = records
-    print(f"Dataset loaded: {len(_records)} rows")
-    if _records:
-        print(f"Columns: {sorted(_records[0].keys())}")
+    _version += 1
     return _records
 
 
+def get_data_version() -> int:
+    return _version
+
+
+def get_data_mtime() -> float:
+    try:
+        return os.path.getmtime(DATA_PATH)
+    except OSError:
+        return 0.0
+
+
 def get_summary() -> dict:
     data = get_records()
     if not data:
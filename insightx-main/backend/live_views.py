@@ -0,0 +1,239 @@
+import asyncio
+import json
+import math
+from typing import Dict, Any, List, Tuple, Callable
+
+from fastapi import WebSocket
+from starlette.concurrency import run_in_threadpool
+
+from data_loader import get_summary, get_data_version
+from query_engine import (
+    get_failure_analysis,
+    get_success_rate_by_segment,
+    get_regional_analysis,
+    get_transaction_trends
+)
+
+# view name -> (compute function, {param name: type})
+VIEWS: Dict[str, Tuple[Callable[..., dict], Dict[str, type]]] = {
+    "summary": (get_summary, {}),
+    "failures": (get_failure_analysis, {"peak_only": bool}),
+    "segments": (get_success_rate_by_segment, {"transaction_type": str, "min_amount": float}),
+    "regional": (get_regional_analysis, {"transaction_type": str, "weekend_only": bool}),
+    "trends": (get_transaction_trends, {}),
+}
+
+# Limits so a single client cannot make the server compute arbitrarily many
+# views: subscriptions per socket, distinct views overall, and min_amount must
+# sit on a bucket boundary so nearby values share one computation.
+MAX_SUBSCRIPTIONS_PER_SOCKET = 10
+MAX_VIEWS = 64
+MIN_AMOUNT_STEP = 500
+
+# A subscriber that cannot take a frame within this many seconds is dropped
+# and its socket closed, so the client reconnects instead of going stale.
+SEND_TIMEOUT = 5.0
+
+# One snapshot and one subscriber set per (view, params). Views nobody is
+# subscribed to are dropped, so a data change only recomputes what is watched.
+_snapshots: Dict[str, dict] = {}
+_subscribers: Dict[str, List[WebSocket]] = {}
+_view_specs: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+
+def _coerce(value: Any, kind: type) -> Any:
+    if value is None or value == "":
+        return None
+    if kind is bool:
+        if isinstance(value, str):
+            if value.lower() in ("1", "true", "yes"):
+                return True
+            if value.lower() in ("0", "false", "no"):
+                return False
+            raise ValueError(value)
+        if isinstance(value, bool) or value in (0, 1):
+            return bool(value)
+        raise ValueError(value)
+    if kind is str:
+        if not isinstance(value, str):
+            raise ValueError(value)
+        return value
+    if isinstance(value, bool):
+        raise ValueError(value)
+    number = float(value)
+    if not math.isfinite(number) or number < 0 or number % MIN_AMOUNT_STEP:
+        raise ValueError(value)
+    return int(number)
+
+
+def resolve_view(view: str, params: Dict[str, Any] = None) -> Tuple[str, Dict[str, Any]]:
+    """
+    Validate a subscription and return its canonical id, e.g.
+    ``failures?peak_only=true``, plus the keyword arguments for the view.
+    """
+    if not isinstance(view, str) or view not in VIEWS:
+        raise ValueError(f"Unknown view: {view}")
+    _, spec = VIEWS[view]
+    params = params or {}
+    if not isinstance(params, dict):
+        raise ValueError("params must be an object")
+    unknown = [name for name in params if name not in spec]
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) for {view}: {', '.join(unknown)}")
+
+    kwargs: Dict[str, Any] = {}
+    for name, kind in spec.items():
+        try:
+            value = _coerce(params.get(name), kind)
+        except (TypeError, ValueError, OverflowError):
+            if kind is float:
+                raise ValueError(
+                    f"Invalid value for {name}: {params.get(name)!r} "
+                    f"(must be a non-negative multiple of {MIN_AMOUNT_STEP})"
+                )
+            raise ValueError(f"Invalid value for {name}: {params.get(name)!r}")
+        if value is not None and value is not False:
+            kwargs[name] = value
+
+    query = "&".join(f"{name}={json.dumps(kwargs[name])}" for name in sorted(kwargs))
+    view_id = f"{view}?{query}" if query else view
+    return view_id, kwargs
+
+
+def diff(old: Any, new: Any) -> Tuple[Dict[str, Any], List[List[str]]]:
+    """
+    Compact delta between two JSON-like dicts: ``changed`` holds only the
+    leaves that differ (nested objects are diffed, lists are replaced whole)
+    and ``removed`` lists key paths that no longer exist.
+    """
+    changed: Dict[str, Any] = {}
+    removed: List[List[str]] = []
+    for key, value in new.items():
+        if key not in old:
+            changed[key] = value
+        elif isinstance(value, dict) and isinstance(old[key], dict):
+            sub_changed, sub_removed = diff(old[key], value)
+            if sub_changed:
+                changed[key] = sub_changed
+            removed.extend([key] + path for path in sub_removed)
+        elif value != old[key]:
+            changed[key] = value
+    removed.extend([key] for key in old if key not in new)
+    return changed, removed
+
+
+async def _compute(view: str, kwargs: Dict[str, Any]) -> dict:
+    func, _ = VIEWS[view]
+    # round-trip through JSON so snapshots compare exactly as clients see them
+    result = await run_in_threadpool(func, **kwargs)
+    return json.loads(json.dumps(result, default=str))
+
+
+async def _send_all(websocket: WebSocket, frames: List[str]) -> bool:
+    try:
+        for text in frames:
+            await asyncio.wait_for(websocket.send_text(text), SEND_TIMEOUT)
+        return True
+    except Exception:
+        return False
+
+
+async def _close(websocket: WebSocket) -> None:
+    try:
+        await asyncio.wait_for(websocket.close(code=1011), SEND_TIMEOUT)
+    except Exception:
+        pass
+
+
+def _subscription_count(websocket: WebSocket) -> int:
+    return sum(1 for subscribers in _subscribers.values() if websocket in subscribers)
+
+
+async def subscribe(
+    websocket: WebSocket, view: str, params: Dict[str, Any] = None, ref: Any = None
+) -> str:
+    view_id, kwargs = resolve_view(view, params)
+    subscribers = _subscribers.get(view_id, [])
+    if websocket not in subscribers:
+        if _subscription_count(websocket) >= MAX_SUBSCRIPTIONS_PER_SOCKET:
+            raise ValueError(f"At most {MAX_SUBSCRIPTIONS_PER_SOCKET} subscriptions per connection")
+        if view_id not in _snapshots and len(_snapshots) >= MAX_VIEWS:
+            raise ValueError("Too many distinct live views, try again later")
+
+    if view_id not in _snapshots:
+        # only register the view once it has computed successfully
+        snapshot = await _compute(view, kwargs)
+        _snapshots.setdefault(view_id, snapshot)
+    _view_specs.setdefault(view_id, (view, kwargs))
+
+    subscribers = _subscribers.setdefault(view_id, [])
+    if websocket not in subscribers:
+        subscribers.append(websocket)
+
+    await websocket.send_text(json.dumps({
+        "type": "snapshot",
+        "id": view_id,
+        "ref": ref,
+        "version": get_data_version(),
+        "data": _snapshots[view_id],
+    }))
+    return view_id
+
+
+def unsubscribe(websocket: WebSocket, view_id: str = None) -> None:
+    """Drop one subscription, or every subscription of the socket if no id."""
+    view_ids = [view_id] if view_id else list(_subscribers)
+    for vid in view_ids:
+        subscribers = _subscribers.get(vid)
+        if not subscribers or websocket not in subscribers:
+            continue
+        subscribers.remove(websocket)
+        if not subscribers:
+            del _subscribers[vid]
+            _snapshots.pop(vid, None)
+            _view_specs.pop(vid, None)
+
+
+async def publish() -> int:
+    """
+    Recompute every subscribed view once, then push the deltas to all
+    subscribers concurrently. Returns the number of views that changed.
+    """
+    version = get_data_version()
+    outbox: Dict[WebSocket, List[str]] = {}
+    updated = 0
+    for view_id in list(_subscribers):
+        if view_id not in _view_specs:
+            continue
+        try:
+            new = await _compute(*_view_specs[view_id])
+        except Exception as e:
+            print(f"[Live] Recompute of {view_id} failed: {e}")
+            continue
+        if view_id not in _subscribers:
+            # last subscriber left while computing; the view is gone
+            continue
+        changed, removed = diff(_snapshots.get(view_id, {}), new)
+        _snapshots[view_id] = new
+        if not changed and not removed:
+            continue
+        updated += 1
+
+        # encode once, queue the same frame for every subscriber
+        text = json.dumps({
+            "type": "delta",
+            "id": view_id,
+            "version": version,
+            "changed": changed,
+            "removed": removed,
+        })
+        for websocket in _subscribers.get(view_id, []):
+            outbox.setdefault(websocket, []).append(text)
+
+    sockets = list(outbox)
+    results = await asyncio.gather(*(_send_all(ws, outbox[ws]) for ws in sockets))
+    dropped = [ws for ws, ok in zip(sockets, results) if not ok]
+    for websocket in dropped:
+        unsubscribe(websocket)
+    await asyncio.gather(*(_close(ws) for ws in dropped))
+    return updated
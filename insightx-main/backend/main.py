@@ -1,25 +1,29 @@
 from contextlib import asynccontextmanager
 import asyncio
+import json
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Optional
 import uvicorn
 
 from ai_handler import ask_insightx
-from data_loader import get_summary
+from data_loader import get_summary, get_data_mtime, reload_records
 from query_engine import (
     get_failure_analysis,
     get_success_rate_by_segment,
     get_regional_analysis,
     get_transaction_trends
 )
+from segment_index import build_segment_indexes, get_top_segments, get_anomalies
+import live_views
 
 # ─────────────────────────────────────────────
 # Config
 # ─────────────────────────────────────────────
 RENDER_URL = "https://insightx-main.onrender.com"  # 🔁 Replace with your actual Render URL
+DATA_WATCH_INTERVAL = 30  # seconds between dataset change checks
 
 conversation_store = {}
 
@@ -39,6 +43,26 @@ async def keep_alive():
             await asyncio.sleep(4 * 60)  # Ping every 4 minutes
 
 
+# ─────────────────────────────────────────────
+# Dataset Watcher: Recompute Live Views Once Per Change
+# ─────────────────────────────────────────────
+async def watch_dataset():
+    last_mtime = get_data_mtime()
+    while True:
+        await asyncio.sleep(DATA_WATCH_INTERVAL)
+        mtime = get_data_mtime()
+        if mtime == last_mtime:
+            continue
+        last_mtime = mtime
+        try:
+            await asyncio.to_thread(reload_records)
+            await asyncio.to_thread(build_segment_indexes)
+            updated = await live_views.publish()
+            print(f"[Watcher] Dataset reloaded, pushed {updated} view update(s)")
+        except Exception as e:
+            print(f"[Watcher] Reload failed: {e}")
+
+
 # ─────────────────────────────────────────────
 # Lifespan: Preload Data + Start Ping Loop
 # ─────────────────────────────────────────────
@@ -47,8 +71,12 @@ async def lifespan(app: FastAPI):
     print("[Startup] Preloading dataset into memory...")
     get_summary()  # Triggers _records cache in data_loader.py
     print("[Startup] Dataset preloaded and ready!")
+    build_segment_indexes()  # Mines all 1- and 2-dimension segments once
+    print("[Startup] Segment index built!")
     asyncio.create_task(keep_alive())  # Start keep-alive loop
     print("[Startup] Keep-alive loop started!")
+    asyncio.create_task(watch_dataset())  # Push dashboard deltas on data change
+    print("[Startup] Dataset watcher started!")
     yield
     print("[Shutdown] Server shutting down...")
 
@@ -143,6 +171,87 @@ def trends():
     return get_transaction_trends()
 
 
+@app.get("/api/data/segments/top")
+def top_segments(
+    dimensions: str,
+    metric: str = "success_rate",
+    k: int = 5,
+    worst: bool = False,
+    transaction_type: Optional[str] = None,
+    weekend_only: bool = False,
+    min_amount: Optional[float] = None,
+):
+    try:
+        segments = get_top_segments(
+            dimensions, metric=metric, k=k, worst=worst,
+            transaction_type=transaction_type, weekend_only=weekend_only,
+            min_amount=min_amount,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"dimensions": dimensions, "metric": metric, "worst": worst, "segments": segments}
+
+
+@app.get("/api/data/anomalies")
+def anomalies(
+    metric: str = "failure_rate",
+    k: int = 10,
+    transaction_type: Optional[str] = None,
+    weekend_only: bool = False,
+):
+    try:
+        return get_anomalies(
+            metric=metric, k=k, transaction_type=transaction_type,
+            weekend_only=weekend_only,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.websocket("/ws/dashboard")
+async def dashboard_stream(websocket: WebSocket):
+    """
+    Clients send {"action": "subscribe", "ref": ..., "view": "failures", "params": {...}}
+    and receive a full snapshot echoing the ref, then only deltas (by view id)
+    whenever the data changes.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            ref = None
+            try:
+                try:
+                    message = json.loads(frame.get("text") or frame.get("bytes") or "")
+                except ValueError:
+                    raise ValueError("Message must be valid JSON")
+                if not isinstance(message, dict):
+                    raise ValueError("Message must be a JSON object")
+                ref = message.get("ref")
+                action = message.get("action")
+                if action == "subscribe":
+                    await live_views.subscribe(
+                        websocket, message.get("view"), message.get("params"), ref=ref
+                    )
+                elif action == "unsubscribe":
+                    live_views.unsubscribe(websocket, message.get("id"))
+                else:
+                    raise ValueError(f"Unknown action: {action}")
+            except ValueError as e:
+                await websocket.send_json({"type": "error", "ref": ref, "detail": str(e)})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                print(f"[Live] Subscription failed: {e}")
+                await websocket.send_json({"type": "error", "ref": ref, "detail": "Failed to compute view"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_views.unsubscribe(websocket)
+
+
 # ─────────────────────────────────────────────
 # Local Dev Entry Point
 # ─────────────────────────────────────────────
@@ -1,8 +1,9 @@
 from collections import Counter, defaultdict
 from statistics import mean
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List
 
 from data_loader import get_records
+from segment_index import get_segment_index, get_top_segments, scan_segments
 
 
 def _as_float(value: Any, default: float = 0.0) -> float:
@@ -18,12 +19,6 @@ def _is_success(status: Any) -> bool:
     return status == "SUCCESS"
 
 
-def _is_fraud(flag: Any) -> bool:
-    if flag in (1, "1", True, "True", "true"):
-        return True
-    return False
-
-
 def get_failure_analysis(peak_only: bool = False) -> dict:
     data = get_records()
     if peak_only:
@@ -69,74 +64,39 @@ def get_failure_analysis(peak_only: bool = False) -> dict:
 def get_success_rate_by_segment(
     transaction_type: str = None, min_amount: float = None
 ) -> dict:
-    data = get_records()
-
-    filtered: List[Dict[str, Any]] = []
-    for r in data:
-        if transaction_type and r.get("transaction_type") != transaction_type:
-            continue
-        amount = _as_float(r.get("amount_inr"))
-        if min_amount is not None and amount < min_amount:
-            continue
-        filtered.append(r)
-
-    # success rate by (age_group, device_type)
-    segment_stats: Dict[Tuple[str, str], Dict[str, int]] = {}
-    for r in filtered:
-        age_group = r.get("sender_age_group") or "Unknown"
-        device_type = r.get("device_type") or "Unknown"
-        key = (age_group, device_type)
-        stat = segment_stats.setdefault(key, {"total": 0, "success": 0})
-        stat["total"] += 1
-        if _is_success(r.get("transaction_status")):
-            stat["success"] += 1
-
-    segments = []
-    for (age_group, device_type), stat in segment_stats.items():
-        total = stat["total"]
-        success = stat["success"]
-        success_rate = round(success / total * 100, 2) if total else 0.0
-        segments.append(
-            {
-                "age_group": age_group,
-                "device_type": device_type,
-                "success_rate": success_rate,
-            }
-        )
-
-    top_segments = sorted(
-        segments, key=lambda x: x["success_rate"], reverse=True
-    )[:5]
-
-    # success rate by merchant_category
-    merchant_stats: Dict[str, Dict[str, int]] = {}
-    for r in filtered:
-        merchant = r.get("merchant_category")
-        if not merchant:
-            continue
-        stat = merchant_stats.setdefault(merchant, {"total": 0, "success": 0})
-        stat["total"] += 1
-        if _is_success(r.get("transaction_status")):
-            stat["success"] += 1
-
-    success_by_merchant: Dict[str, float] = {}
-    for merchant, stat in merchant_stats.items():
-        total = stat["total"]
-        success = stat["success"]
-        success_rate = round(success / total * 100, 2) if total else 0.0
-        success_by_merchant[merchant] = success_rate
-
-    fraud_flags = [_is_fraud(r.get("fraud_flag")) for r in filtered]
-    fraud_rate = (
-        round(sum(fraud_flags) / len(fraud_flags) * 100, 2) if fraud_flags else 0.0
-    )
+    # served from the precomputed segment index; min_amount is arbitrary,
+    # so those requests count just the two families needed here
+    families = [("sender_age_group", "device_type"), ("merchant_category",)]
+    if min_amount is None:
+        index = get_segment_index(transaction_type=transaction_type)
+    else:
+        index = scan_segments(families, transaction_type=transaction_type, min_amount=min_amount)
+
+    top_segments = []
+    for s in index["rankings"][families[0]]["success_rate"]["top"][:5]:
+        segment = {
+            "age_group": s["sender_age_group"],
+            "device_type": s["device_type"],
+            "success_rate": s["success_rate"],
+            "total_transactions": s["total_transactions"],
+        }
+        if s.get("low_support"):
+            segment["low_support"] = True
+        top_segments.append(segment)
+
+    # non-P2M rows have no merchant category; keep them out as before
+    success_by_merchant: Dict[str, float] = {
+        s["merchant_category"]: s["success_rate"]
+        for (merchant,), s in index["segments"][families[1]].items()
+        if merchant != "Unknown"
+    }
 
     return {
         "filters": {"transaction_type": transaction_type, "min_amount": min_amount},
-        "sample_size": len(filtered),
+        "sample_size": index["sample_size"],
         "top_segments_by_success": top_segments,
         "success_by_merchant": success_by_merchant,
-        "fraud_flag_rate": fraud_rate,
+        "fraud_flag_rate": index["baseline"]["fraud_rate"],
     }
 
 
@@ -186,28 +146,25 @@ def get_regional_analysis(
 
     by_state_records.sort(key=lambda x: x["total_transactions"], reverse=True)
 
-    # worst state/bank combinations by success_rate
-    state_bank_stats: Dict[Tuple[str, str], Dict[str, int]] = {}
-    for r in filtered:
-        state = r.get("sender_state") or "Unknown"
-        bank = r.get("sender_bank") or "Unknown"
-        key = (state, bank)
-        stat = state_bank_stats.setdefault(key, {"total": 0, "success": 0})
-        stat["total"] += 1
-        if _is_success(r.get("transaction_status")):
-            stat["success"] += 1
-
+    # worst state/bank combinations by success_rate, from the segment index
     worst_combinations = []
-    for (state, bank), stat in state_bank_stats.items():
-        total = stat["total"]
-        success = stat["success"]
-        success_rate = round(success / total * 100, 2) if total else 0.0
-        worst_combinations.append(
-            {"state": state, "bank": bank, "success_rate": success_rate}
-        )
-
-    worst_combinations.sort(key=lambda x: x["success_rate"])
-    worst_combinations = worst_combinations[:5]
+    for s in get_top_segments(
+        ("sender_state", "sender_bank"),
+        metric="success_rate",
+        k=5,
+        worst=True,
+        transaction_type=transaction_type,
+        weekend_only=weekend_only,
+    ):
+        combination = {
+            "state": s["sender_state"],
+            "bank": s["sender_bank"],
+            "success_rate": s["success_rate"],
+            "total_transactions": s["total_transactions"],
+        }
+        if s.get("low_support"):
+            combination["low_support"] = True
+        worst_combinations.append(combination)
 
     # network_by_state: {network_type: {state: count}}
     network_by_state: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
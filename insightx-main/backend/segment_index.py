@@ -0,0 +1,324 @@
+import heapq
+import math
+from collections import Counter
+from itertools import combinations
+from statistics import NormalDist
+from typing import Dict, Any, List, Tuple, Optional, Iterable
+
+from data_loader import get_records
+
+# Dimensions mined at load time. Every single dimension and every pair of
+# dimensions becomes a segment family in the index.
+DIMENSIONS: Tuple[str, ...] = (
+    "transaction_type",
+    "merchant_category",
+    "sender_age_group",
+    "sender_state",
+    "sender_bank",
+    "device_type",
+    "network_type",
+    "day_of_week",
+    "hour_of_day",
+)
+
+FAMILIES: List[Tuple[str, ...]] = (
+    [(d,) for d in DIMENSIONS] + list(combinations(DIMENSIONS, 2))
+)
+
+METRICS: Tuple[str, ...] = ("success_rate", "failure_rate", "fraud_rate")
+
+# Minimum transactions for a segment to be ranked: 0.5% of the filtered
+# sample, clamped to [MIN_SUPPORT_FLOOR, MIN_SUPPORT]. If no segment of a
+# family qualifies, the family is ranked anyway and flagged low_support.
+MIN_SUPPORT = 100
+MIN_SUPPORT_FLOOR = 10
+MIN_SUPPORT_SHARE = 0.005
+
+# Family-wise error rate for anomalies. The z cutoff is Bonferroni-corrected
+# for every segment x metric tested, so random variation is not reported.
+ANOMALY_ALPHA = 0.05
+
+# Depth of every precomputed ranking; queries for k > TOP_K are clamped.
+TOP_K = 20
+
+_SUCCESS = 1
+_FAILED = 2
+_FRAUD = 4
+
+_TRUE_FLAGS = (1, "1", True, "True", "true")
+
+# (transaction_type or None, weekend_only) -> index, built by build_segment_indexes()
+_indexes: Optional[Dict[Tuple[Optional[str], bool], Dict[str, Any]]] = None
+
+
+def _outcome(row: Dict[str, Any]) -> int:
+    status = row.get("transaction_status")
+    code = 0
+    if status == "SUCCESS":
+        code |= _SUCCESS
+    elif status == "FAILED":
+        code |= _FAILED
+    if row.get("fraud_flag") in _TRUE_FLAGS:
+        code |= _FRAUD
+    return code
+
+
+def _column(records: List[Dict[str, Any]], dimension: str) -> List[str]:
+    return [str(r.get(dimension) or "Unknown") for r in records]
+
+
+def _rate(count: int, total: int) -> float:
+    return round(count / total * 100, 2) if total else 0.0
+
+
+def _z_score(count: int, total: int, baseline: float) -> float:
+    if not total or baseline <= 0.0 or baseline >= 1.0:
+        return 0.0
+    stderr = math.sqrt(baseline * (1 - baseline) / total)
+    return round((count / total - baseline) / stderr, 2)
+
+
+def _min_support(total: int) -> int:
+    return max(MIN_SUPPORT_FLOOR, min(MIN_SUPPORT, int(total * MIN_SUPPORT_SHARE)))
+
+
+def _z_threshold(tests: int) -> float:
+    if not tests:
+        return math.inf
+    return round(NormalDist().inv_cdf(1 - ANOMALY_ALPHA / (2 * tests)), 2)
+
+
+def _accumulate(acc: List[int], code: int, count: int) -> None:
+    acc[0] += count
+    if code & _SUCCESS:
+        acc[1] += count
+    if code & _FAILED:
+        acc[2] += count
+    if code & _FRAUD:
+        acc[3] += count
+
+
+def _filter_records(
+    transaction_type: str = None,
+    weekend_only: bool = False,
+    min_amount: float = None,
+) -> List[Dict[str, Any]]:
+    filtered: List[Dict[str, Any]] = []
+    for r in get_records():
+        if transaction_type and r.get("transaction_type") != transaction_type:
+            continue
+        if weekend_only and r.get("is_weekend") not in _TRUE_FLAGS:
+            continue
+        if min_amount is not None:
+            try:
+                amount = float(r.get("amount_inr"))
+            except (TypeError, ValueError):
+                amount = 0.0
+            if amount < min_amount:
+                continue
+        filtered.append(r)
+    return filtered
+
+
+def _canonical(dimensions) -> Tuple[str, ...]:
+    if isinstance(dimensions, str):
+        dimensions = [d for d in dimensions.split(",") if d.strip()]
+    dims = tuple(dict.fromkeys(d.strip() for d in dimensions))
+    unknown = [d for d in dims if d not in DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(unknown)}")
+    if not 1 <= len(dims) <= 2:
+        raise ValueError("Segments are indexed for 1 or 2 dimensions")
+    return tuple(sorted(dims, key=DIMENSIONS.index))
+
+
+def _assemble(
+    totals: List[int],
+    family_counts: Dict[Tuple[str, ...], Dict[Tuple[str, ...], List[int]]],
+    families: Iterable[Tuple[str, ...]],
+) -> Dict[str, Any]:
+    """Turn raw [total, success, failed, fraud] counters into a queryable index."""
+    total = totals[0]
+    baseline_raw = {
+        "success_rate": totals[1] / total if total else 0.0,
+        "failure_rate": totals[2] / total if total else 0.0,
+        "fraud_rate": totals[3] / total if total else 0.0,
+    }
+    min_support = _min_support(total)
+
+    segments: Dict[Tuple[str, ...], Dict[Tuple[str, ...], Dict[str, Any]]] = {}
+    rankings: Dict[Tuple[str, ...], Dict[str, Dict[str, List[Dict[str, Any]]]]] = {}
+    eligible_all: List[Dict[str, Any]] = []
+
+    for dims in families:
+        family: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        for values, (seg_total, seg_success, seg_failed, seg_fraud) in family_counts.get(dims, {}).items():
+            entry: Dict[str, Any] = dict(zip(dims, values))
+            entry["total_transactions"] = seg_total
+            entry["success_rate"] = _rate(seg_success, seg_total)
+            entry["failure_rate"] = _rate(seg_failed, seg_total)
+            entry["fraud_rate"] = _rate(seg_fraud, seg_total)
+            entry["z_scores"] = {
+                "success_rate": _z_score(seg_success, seg_total, baseline_raw["success_rate"]),
+                "failure_rate": _z_score(seg_failed, seg_total, baseline_raw["failure_rate"]),
+                "fraud_rate": _z_score(seg_fraud, seg_total, baseline_raw["fraud_rate"]),
+            }
+            family[values] = entry
+        segments[dims] = family
+
+        eligible = [e for e in family.values() if e["total_transactions"] >= min_support]
+        eligible_all.extend(eligible)
+        if not eligible:
+            # rank what there is rather than return nothing, but say so
+            eligible = [dict(e, low_support=True) for e in family.values()]
+        rankings[dims] = {
+            metric: {
+                "top": heapq.nlargest(
+                    TOP_K, eligible,
+                    key=lambda e, m=metric: (e[m], e["total_transactions"])
+                ),
+                "bottom": heapq.nsmallest(
+                    TOP_K, eligible,
+                    key=lambda e, m=metric: (e[m], -e["total_transactions"])
+                ),
+            }
+            for metric in METRICS
+        }
+
+    min_z_score = _z_threshold(len(eligible_all) * len(METRICS))
+    anomalies: Dict[str, List[Dict[str, Any]]] = {}
+    for metric in METRICS:
+        significant = [e for e in eligible_all if abs(e["z_scores"][metric]) >= min_z_score]
+        anomalies[metric] = heapq.nlargest(
+            TOP_K, significant, key=lambda e, m=metric: abs(e["z_scores"][m])
+        )
+
+    return {
+        "sample_size": total,
+        "baseline": {metric: round(rate * 100, 2) for metric, rate in baseline_raw.items()},
+        "min_support": min_support,
+        "min_z_score": min_z_score,
+        "segments": segments,
+        "rankings": rankings,
+        "anomalies": anomalies,
+    }
+
+
+def _scopes(transaction_type: str, is_weekend: bool):
+    yield (None, False)
+    if transaction_type:
+        yield (transaction_type, False)
+    if is_weekend:
+        yield (None, True)
+        if transaction_type:
+            yield (transaction_type, True)
+
+
+def build_segment_indexes() -> None:
+    """
+    Build the index for every fixed filter scope (all / each transaction
+    type x all days / weekends) in one batched sweep: each family is counted
+    once with a C-level Counter over zipped columns, keyed by scope, then
+    rolled up into every scope the row belongs to.
+    """
+    global _indexes
+    records = get_records()
+    types = [r.get("transaction_type") or "" for r in records]
+    weekends = [r.get("is_weekend") in _TRUE_FLAGS for r in records]
+    outcomes = [_outcome(r) for r in records]
+    columns = {d: _column(records, d) for d in DIMENSIONS}
+
+    totals: Dict[Tuple[Optional[str], bool], List[int]] = {}
+    for (t_type, weekend, code), count in Counter(zip(types, weekends, outcomes)).items():
+        for scope in _scopes(t_type, weekend):
+            _accumulate(totals.setdefault(scope, [0, 0, 0, 0]), code, count)
+
+    scope_counts: Dict[Tuple[Optional[str], bool], Dict[Tuple[str, ...], Dict[Tuple[str, ...], List[int]]]] = {
+        scope: {} for scope in totals
+    }
+    for dims in FAMILIES:
+        counts = Counter(zip(types, weekends, *(columns[d] for d in dims), outcomes))
+        for key, count in counts.items():
+            values, code = key[2:-1], key[-1]
+            for scope in _scopes(key[0], key[1]):
+                family = scope_counts[scope].setdefault(dims, {})
+                _accumulate(family.setdefault(values, [0, 0, 0, 0]), code, count)
+
+    _indexes = {
+        scope: _assemble(totals[scope], scope_counts[scope], FAMILIES)
+        for scope in totals
+    }
+
+
+def get_segment_index(
+    transaction_type: str = None, weekend_only: bool = False
+) -> Dict[str, Any]:
+    """
+    Precomputed segment index for a fixed filter scope. Built at startup and
+    rebuilt when the dataset reloads; unknown transaction types are empty.
+    """
+    if _indexes is None:
+        build_segment_indexes()
+    index = _indexes.get((transaction_type or None, bool(weekend_only)))
+    if index is None:
+        index = _assemble([0, 0, 0, 0], {}, FAMILIES)
+    return index
+
+
+def scan_segments(
+    families, transaction_type: str = None, weekend_only: bool = False,
+    min_amount: float = None,
+) -> Dict[str, Any]:
+    """
+    Ad-hoc index for filters that cannot be precomputed (any min_amount):
+    one filtering pass, then only the requested families are counted.
+    """
+    families = [_canonical(dims) for dims in families]
+    records = _filter_records(transaction_type, weekend_only, min_amount)
+    outcomes = [_outcome(r) for r in records]
+    columns = {d: _column(records, d) for d in {d for dims in families for d in dims}}
+
+    totals = [0, 0, 0, 0]
+    for code, count in Counter(outcomes).items():
+        _accumulate(totals, code, count)
+
+    family_counts: Dict[Tuple[str, ...], Dict[Tuple[str, ...], List[int]]] = {}
+    for dims in families:
+        family = family_counts.setdefault(dims, {})
+        for key, count in Counter(zip(*(columns[d] for d in dims), outcomes)).items():
+            _accumulate(family.setdefault(key[:-1], [0, 0, 0, 0]), key[-1], count)
+
+    return _assemble(totals, family_counts, families)
+
+
+def get_top_segments(
+    dimensions, metric: str = "success_rate", k: int = 5, worst: bool = False,
+    transaction_type: str = None, weekend_only: bool = False,
+    min_amount: float = None,
+) -> List[Dict[str, Any]]:
+    dims = _canonical(dimensions)
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    if min_amount is None:
+        index = get_segment_index(transaction_type, weekend_only)
+    else:
+        index = scan_segments([dims], transaction_type, weekend_only, min_amount)
+    ranking = index["rankings"][dims][metric]["bottom" if worst else "top"]
+    return ranking[:max(k, 0)]
+
+
+def get_anomalies(
+    metric: str = "failure_rate", k: int = 10,
+    transaction_type: str = None, weekend_only: bool = False,
+) -> dict:
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    index = get_segment_index(transaction_type, weekend_only)
+    return {
+        "metric": metric,
+        "baseline": index["baseline"][metric],
+        "sample_size": index["sample_size"],
+        "min_support": index["min_support"],
+        "min_z_score": index["min_z_score"],
+        "anomalies": index["anomalies"][metric][:max(k, 0)],
+    }
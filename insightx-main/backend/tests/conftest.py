@@ -0,0 +1,6 @@
+import os
+import sys
+
+# backend modules import each other as top-level modules (``from data_loader
+# import ...``), so put the backend directory itself on the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
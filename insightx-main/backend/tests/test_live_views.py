@@ -0,0 +1,159 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import live_views
+from live_views import diff, resolve_view
+
+
+class FakeSocket:
+    def __init__(self, block=False):
+        self.frames = []
+        self.closed_with = None
+        self.block = block
+
+    async def send_text(self, text):
+        if self.block:
+            await asyncio.sleep(60)
+        self.frames.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    monkeypatch.setattr(live_views, "_snapshots", {})
+    monkeypatch.setattr(live_views, "_subscribers", {})
+    monkeypatch.setattr(live_views, "_view_specs", {})
+    monkeypatch.setattr(live_views, "get_data_version", lambda: 1)
+
+
+def test_diff_nested_changes_and_removed_paths():
+    old = {"total": 10, "by_bank": {"SBI": 3, "HDFC": 2}, "top": [1, 2], "gone": 1}
+    new = {"total": 11, "by_bank": {"SBI": 3, "ICICI": 4}, "top": [1, 2], "added": {"x": 1}}
+    changed, removed = diff(old, new)
+    assert changed == {"total": 11, "by_bank": {"ICICI": 4}, "added": {"x": 1}}
+    assert sorted(removed) == [["by_bank", "HDFC"], ["gone"]]
+    assert diff(new, new) == ({}, [])
+
+
+def test_diff_replaces_lists_whole():
+    changed, removed = diff({"rows": [1, 2, 3]}, {"rows": [1, 2]})
+    assert changed == {"rows": [1, 2]}
+    assert removed == []
+
+
+def test_resolve_view_canonical_id():
+    view_id, kwargs = resolve_view("regional", {"weekend_only": "true", "transaction_type": "P2P"})
+    assert view_id == 'regional?transaction_type="P2P"&weekend_only=true'
+    assert kwargs == {"transaction_type": "P2P", "weekend_only": True}
+    assert resolve_view("failures", {"peak_only": "false"}) == ("failures", {})
+    assert resolve_view("segments", {"min_amount": 5000})[0] == "segments?min_amount=5000"
+
+
+@pytest.mark.parametrize("view, params", [
+    ("nope", None),
+    (["summary"], None),
+    ("failures", [1]),
+    ("failures", {"peak_only": "ture"}),
+    ("failures", {"peak_only": 2}),
+    ("failures", {"colour": "red"}),
+    ("regional", {"transaction_type": 5}),
+    ("segments", {"min_amount": 999}),
+    ("segments", {"min_amount": -500}),
+    ("segments", {"min_amount": "nan"}),
+    ("segments", {"min_amount": True}),
+])
+def test_resolve_view_rejects_bad_input(view, params):
+    with pytest.raises(ValueError):
+        resolve_view(view, params)
+
+
+def test_unsubscribe_during_recompute_leaves_no_orphan(monkeypatch):
+    calls = {"n": 0}
+    gate = asyncio.Event()
+
+    async def fake_compute(view, kwargs):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            await gate.wait()
+        return {"n": calls["n"]}
+
+    monkeypatch.setattr(live_views, "_compute", fake_compute)
+
+    async def scenario():
+        a, c = FakeSocket(), FakeSocket()
+        await live_views.subscribe(a, "summary")
+        publishing = asyncio.create_task(live_views.publish())
+        await asyncio.sleep(0)
+        live_views.unsubscribe(a)
+        gate.set()
+        assert await publishing == 0
+        assert "summary" not in live_views._snapshots
+
+        await live_views.subscribe(c, "summary")
+        assert live_views._view_specs["summary"] == ("summary", {})
+        assert await live_views.publish() == 1
+        assert c.frames[-1]["type"] == "delta"
+
+    asyncio.run(scenario())
+
+
+def test_spec_restored_for_existing_snapshot(monkeypatch):
+    async def fake_compute(view, kwargs):
+        return {"n": 1}
+
+    monkeypatch.setattr(live_views, "_compute", fake_compute)
+    live_views._snapshots["summary"] = {"n": 0}
+
+    async def scenario():
+        await live_views.subscribe(FakeSocket(), "summary")
+        assert "summary" in live_views._view_specs
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_dropped_and_closed(monkeypatch):
+    counter = {"n": 0}
+
+    async def fake_compute(view, kwargs):
+        counter["n"] += 1
+        return {"n": counter["n"]}
+
+    monkeypatch.setattr(live_views, "_compute", fake_compute)
+    monkeypatch.setattr(live_views, "SEND_TIMEOUT", 0.05)
+
+    async def scenario():
+        fast, slow = FakeSocket(), FakeSocket()
+        await live_views.subscribe(fast, "summary")
+        await live_views.subscribe(slow, "summary")
+        slow.block = True
+        assert await live_views.publish() == 1
+        assert fast.frames[-1]["changed"] == {"n": 2}
+        assert slow.closed_with == 1011
+        assert fast.closed_with is None
+        assert live_views._subscribers["summary"] == [fast]
+
+    asyncio.run(scenario())
+
+
+def test_subscription_cap(monkeypatch):
+    async def fake_compute(view, kwargs):
+        return {}
+
+    monkeypatch.setattr(live_views, "_compute", fake_compute)
+    monkeypatch.setattr(live_views, "MAX_SUBSCRIPTIONS_PER_SOCKET", 2)
+
+    async def scenario():
+        ws = FakeSocket()
+        await live_views.subscribe(ws, "summary")
+        await live_views.subscribe(ws, "trends")
+        await live_views.subscribe(ws, "summary")  # re-subscribing is free
+        with pytest.raises(ValueError):
+            await live_views.subscribe(ws, "failures")
+
+    asyncio.run(scenario())
@@ -0,0 +1,116 @@
+import pytest
+
+import segment_index
+from segment_index import (
+    METRICS,
+    build_segment_indexes,
+    get_anomalies,
+    get_segment_index,
+    get_top_segments,
+    scan_segments,
+    _z_threshold,
+)
+
+
+def _rows(n, success, state, **fields):
+    base = {
+        "transaction_type": "P2P",
+        "sender_bank": "SBI",
+        "device_type": "Android",
+        "is_weekend": "0",
+        "amount_inr": "1000",
+        "fraud_flag": "0",
+    }
+    base.update(fields)
+    return [
+        dict(base, sender_state=state, transaction_status="SUCCESS" if i < success else "FAILED")
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def records(monkeypatch):
+    data = (
+        _rows(200, 190, "Delhi")                        # 95%
+        + _rows(200, 150, "Kerala")                     # 75%
+        + _rows(200, 170, "Punjab", is_weekend="1")     # 85%
+        + _rows(5, 0, "Goa")                            # below support
+        + _rows(20, 18, "", transaction_type="P2M")     # empty -> Unknown
+    )
+    monkeypatch.setattr(segment_index, "get_records", lambda: data)
+    monkeypatch.setattr(segment_index, "_indexes", None)
+    return data
+
+
+def test_rates_and_ranking_order(records):
+    top = get_top_segments("sender_state", metric="success_rate", k=5)
+    assert [s["sender_state"] for s in top] == ["Delhi", "Unknown", "Punjab", "Kerala"]
+    assert top[0]["success_rate"] == 95.0
+    assert top[0]["failure_rate"] == 5.0
+    assert top[0]["total_transactions"] == 200
+
+    worst = get_top_segments("sender_state", metric="success_rate", k=2, worst=True)
+    assert [s["sender_state"] for s in worst] == ["Kerala", "Punjab"]
+
+
+def test_support_cutoff_scales_with_sample(records):
+    index = get_segment_index()
+    # 625 rows -> 0.5% is 3, clamped up to the floor of 10
+    assert index["min_support"] == 10
+    ranked = {s["sender_state"] for s in get_top_segments("sender_state", k=20)}
+    assert "Goa" not in ranked
+    assert ("Goa",) in index["segments"][("sender_state",)]
+
+
+def test_low_support_fallback_is_flagged(records):
+    # 5 Goa rows only: nothing reaches the floor, so rank them anyway
+    index = scan_segments([("sender_state",)], min_amount=0, transaction_type="Nope")
+    assert index["sample_size"] == 0
+    assert index["rankings"][("sender_state",)]["success_rate"]["top"] == []
+
+    records[:] = _rows(5, 1, "Goa") + _rows(4, 4, "Assam")
+    index = scan_segments([("sender_state",)], min_amount=0)
+    top = index["rankings"][("sender_state",)]["success_rate"]["top"]
+    assert [s["sender_state"] for s in top] == ["Assam", "Goa"]
+    assert all(s["low_support"] for s in top)
+    assert "low_support" not in index["segments"][("sender_state",)][("Goa",)]
+
+
+def test_filter_scopes_match_ad_hoc_scan(records):
+    build_segment_indexes()
+    for transaction_type, weekend_only in [(None, False), ("P2P", False), ("P2P", True), ("P2M", False)]:
+        precomputed = get_segment_index(transaction_type, weekend_only)
+        scanned = scan_segments(
+            [("sender_state", "sender_bank")], transaction_type, weekend_only, min_amount=0
+        )
+        dims = ("sender_state", "sender_bank")
+        assert precomputed["sample_size"] == scanned["sample_size"]
+        assert precomputed["segments"][dims] == scanned["segments"][dims]
+    assert get_segment_index("P2P", True)["sample_size"] == 200
+    assert get_segment_index("Unknown type")["sample_size"] == 0
+
+
+def test_anomaly_cutoff_is_bonferroni_over_segments_and_metrics(records):
+    index = get_segment_index()
+    eligible = sum(
+        1
+        for family in index["segments"].values()
+        for e in family.values()
+        if e["total_transactions"] >= index["min_support"]
+    )
+    assert index["min_z_score"] == _z_threshold(eligible * len(METRICS))
+    assert _z_threshold(2000 * 3) > _z_threshold(2000) > 4.0
+
+    anomalies = get_anomalies("failure_rate", k=20)["anomalies"]
+    assert all(abs(a["z_scores"]["failure_rate"]) >= index["min_z_score"] for a in anomalies)
+    # Kerala fails at 25% against a ~16% baseline over 200 rows: not significant
+    assert not any(a.get("sender_state") == "Kerala" for a in anomalies)
+
+
+def test_rejects_unknown_or_too_many_dimensions(records):
+    with pytest.raises(ValueError):
+        get_top_segments("colour")
+    with pytest.raises(ValueError):
+        get_top_segments("sender_state,sender_bank,device_type")
+    with pytest.raises(ValueError):
+        get_top_segments("sender_state", metric="volume")
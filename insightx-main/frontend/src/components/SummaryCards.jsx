@@ -1,5 +1,10 @@
-import { useState, useEffect } from "react"
-import axios from "axios"
+import { useLiveViews } from "../lib/liveViews"
+
+const DASHBOARD_VIEWS = {
+  summary: { view: "summary" },
+  failures: { view: "failures" },
+  trends: { view: "trends" },
+}
 
 function StatCard({ title, value, subtitle, icon, accent = false }) {
   return (
@@ -101,30 +106,9 @@ function LoadingCard() {
 }
 
 export default function SummaryCards() {
-  const [summary, setSummary] = useState(null)
-  const [failures, setFailures] = useState(null)
-  const [trends, setTrends] = useState(null)
-  const [loading, setLoading] = useState(true)
-
-  useEffect(() => {
-    const fetchAll = async () => {
-      try {
-        const [s, f, t] = await Promise.all([
-          axios.get("https://insightx-main.onrender.com/api/summary"),
-          axios.get("https://insightx-main.onrender.com/api/data/failures"),
-          axios.get("https://insightx-main.onrender.com/api/data/trends")
-        ])
-        setSummary(s.data)
-        setFailures(f.data)
-        setTrends(t.data)
-      } catch (err) {
-        console.error("Failed to fetch", err)
-      } finally {
-        setLoading(false)
-      }
-    }
-    fetchAll()
-  }, [])
+  // Server pushes a snapshot per view, then only changed fields on data updates
+  const { views, loading, error } = useLiveViews(DASHBOARD_VIEWS)
+  const { summary, failures, trends } = views
 
   const peakHours = trends?.by_hour?.filter(
     h => h.hour_of_day >= 18 && h.hour_of_day <= 22
@@ -168,7 +152,7 @@ export default function SummaryCards() {
               fontFamily: "'JetBrains Mono', monospace",
               color: "var(--accent)", letterSpacing: "0.8px",
               textTransform: "uppercase"
-            }}>Live Dashboard</span>
+            }}>{error ? "Live updates paused" : "Live Dashboard"}</span>
           </div>
           <h1 style={{
             fontSize: "18px", fontWeight: "600",
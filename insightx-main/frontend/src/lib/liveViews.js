@@ -0,0 +1,129 @@
+import { useState, useEffect } from "react"
+import axios from "axios"
+
+const API_URL = "https://insightx-main.onrender.com"
+const WS_URL = "wss://insightx-main.onrender.com/ws/dashboard"
+const RECONNECT_MS = 3000
+
+function isObject(value) {
+  return value !== null && typeof value === "object" && !Array.isArray(value)
+}
+
+// Merge a server delta into the previous snapshot: nested objects are
+// merged, everything else is replaced, removed paths are deleted.
+export function applyDelta(prev, changed, removed = []) {
+  const next = { ...prev }
+  for (const [key, value] of Object.entries(changed)) {
+    next[key] = isObject(value) && isObject(prev?.[key])
+      ? applyDelta(prev[key], value)
+      : value
+  }
+  for (const path of removed) {
+    let node = next
+    for (let i = 0; i < path.length - 1; i++) {
+      if (!isObject(node[path[i]])) { node = null; break }
+      node[path[i]] = { ...node[path[i]] }
+      node = node[path[i]]
+    }
+    if (node) delete node[path[path.length - 1]]
+  }
+  return next
+}
+
+// One-off REST fetch of a view, used when the live connection is unavailable
+function fetchView({ view, params }) {
+  const path = view === "summary" ? "/api/summary" : `/api/data/${view}`
+  return axios.get(`${API_URL}${path}`, { params }).then(res => res.data)
+}
+
+// Subscribe to server-pushed aggregate views, e.g.
+// useLiveViews({ summary: { view: "summary" }, failures: { view: "failures", params: { peak_only: true } } })
+export function useLiveViews(subscriptions) {
+  const [views, setViews] = useState({})
+  const [loading, setLoading] = useState(true)
+  const [error, setError] = useState(null)
+  const key = JSON.stringify(subscriptions)
+
+  useEffect(() => {
+    const subs = JSON.parse(key)
+    const pending = new Set(Object.keys(subs))
+    let socket
+    let retry
+    let closed = false
+    let opened = false
+    let fellBack = false
+    const ids = {}
+
+    // loading clears once every view has either data or an error
+    const settle = (name) => {
+      pending.delete(name)
+      if (!pending.size) setLoading(false)
+    }
+
+    const fallback = () => {
+      fellBack = true
+      Promise.allSettled(Object.entries(subs).map(([name, sub]) =>
+        fetchView(sub).then(data => {
+          setViews(prev => (name in prev ? prev : { ...prev, [name]: data }))
+        })
+      )).then(results => {
+        if (closed) return
+        if (results.some(r => r.status === "rejected")) {
+          console.error("Failed to fetch", results.find(r => r.status === "rejected").reason)
+          setError("Live updates unavailable")
+        }
+        setLoading(false)
+      })
+    }
+
+    const connect = () => {
+      socket = new WebSocket(WS_URL)
+      socket.onopen = () => {
+        opened = true
+        setError(null)
+        Object.entries(subs).forEach(([name, { view, params }]) =>
+          socket.send(JSON.stringify({ action: "subscribe", ref: name, view, params }))
+        )
+      }
+      socket.onmessage = (event) => {
+        const msg = JSON.parse(event.data)
+        if (msg.type === "snapshot") {
+          if (!(msg.ref in subs)) return
+          ids[msg.ref] = msg.id
+          setViews(prev => ({ ...prev, [msg.ref]: msg.data }))
+          settle(msg.ref)
+        } else if (msg.type === "delta") {
+          const targets = Object.keys(ids).filter(n => ids[n] === msg.id)
+          if (!targets.length) return
+          setViews(prev => {
+            const next = { ...prev }
+            targets.forEach(n => { next[n] = applyDelta(prev[n], msg.changed, msg.removed) })
+            return next
+          })
+        } else if (msg.type === "error") {
+          console.error("Live view error", msg.detail)
+          if (msg.ref in subs) {
+            setError(msg.detail)
+            settle(msg.ref)
+          }
+        }
+      }
+      socket.onclose = () => {
+        Object.keys(ids).forEach(n => delete ids[n])
+        if (closed) return
+        // never reached the server: show REST data once while retrying
+        if (!opened && !fellBack) fallback()
+        retry = setTimeout(connect, RECONNECT_MS)
+      }
+    }
+
+    connect()
+    return () => {
+      closed = true
+      clearTimeout(retry)
+      socket?.close()
+    }
+  }, [key])
+
+  return { views, loading, error }
+}